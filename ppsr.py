@@ -1,20 +1,33 @@
 import asyncio
+import atexit
+import hashlib
+import hmac
+import json
 import platform
 import random
+import secrets
+import time
 import os
 import uuid
 import logging
-from logging.handlers import TimedRotatingFileHandler
+import queue
+from urllib.parse import urljoin
+from logging.handlers import TimedRotatingFileHandler, QueueHandler, QueueListener
 from dotenv import load_dotenv
 
 # 🪟 Fix Playwright subprocess issue on Windows
 if platform.system() == "Windows":
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+else:
+    # ⚡ libuv-backed event loop for faster socket/timer dispatch on POSIX
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
 
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, Field
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, Dict, Any
-from playwright.async_api import async_playwright
+from playwright.async_api import async_playwright, Browser, BrowserContext, TimeoutError as PWTimeout
 import uvicorn
 
 # Load environment variables
@@ -35,29 +48,176 @@ if not logger.handlers:
     ch = logging.StreamHandler()
     fmt = logging.Formatter("%(asctime)s | %(levelname)s | %(message)s")
     fh.setFormatter(fmt); ch.setFormatter(fmt)
-    logger.addHandler(fh); logger.addHandler(ch)
+    # Event loop only enqueues records; a listener thread does the file/console I/O
+    log_queue = queue.Queue(-1)
+    logger.addHandler(QueueHandler(log_queue))
+    log_listener = QueueListener(log_queue, fh, ch)
+    log_listener.start()
+    atexit.register(log_listener.stop)
 
-app = FastAPI(title="PPSR Automation API", version="1.1.0")
+app = FastAPI(title="PPSR Automation API", version="1.1.0", default_response_class=ORJSONResponse)
+
+# ------------------------
+# Settings (read once at import)
+# ------------------------
+def _env_flag(name: str, default: str) -> bool:
+    return str(os.getenv(name, default)).strip().lower() in ("1", "true", "yes", "on")
+
+def _env_int(name: str, default: int, minimum: int = 1) -> int:
+    raw = os.getenv(name, str(default)).strip()
+    try:
+        value = int(raw)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer, got {raw!r}") from None
+    if value < minimum:
+        raise ValueError(f"{name} must be >= {minimum}, got {value}")
+    return value
+
+HEADLESS_MODE = _env_flag("HEADLESS", "true")
+# Human-like pacing (slow_mo, typing cadence, pauses, network delay) is opt-in
+HUMAN_LIKE = _env_flag("HUMAN_LIKE", "false")
+# fill() fields in one CDP call; defaults to on unless HUMAN_LIKE (override for anti-bot testing)
+FAST_INPUT = _env_flag("FAST_INPUT", "false" if HUMAN_LIKE else "true")
+
+# Screenshots and Playwright tracing are debug-only
+DEBUG = _env_flag("PPSR_DEBUG", "0")
 
 # Slow-down and selectors
-SLOW_MO_MS = 1500  # slows every Playwright action (human-like)
+SLOW_MO_MS = 1500 if HUMAN_LIKE else 0  # slows every Playwright action (human-like)
 WAIT_AFTER_ACTION_MS = 2400  # base waits between major steps
 DECLARATION_CHECKBOX = "#ctl00_ctl00_m_cpContent_cbDeclaration_cbDeclaration"
 POPUP_OK_SELECTOR = "#confirmation_bOkay"  # OK button on confirmation modal
 MAIN_MENU = "#mainMenu"
+LOGIN_FORM = "input[type='text'], input[type='password']"
 VIN_INPUT = "#ctl00_ctl00_m_cpProgressWizard_ucPW_ucSN_ucSN_txtVIN"
 SEARCH_DECLARATION_CB = "#ctl00_ctl00_m_cpProgressWizard_ucPW_ucSN_ucDeclarationCheckboxAndContent_cbDeclaration"
-VIN_WATERMARK_FOCUS_JS = "OnWatermarkTextboxFocus('ctl00_ctl00_m_cpProgressWizard_ucPW_ucSN_ucSN_txtVIN')"
-VIN_WATERMARK_BLUR_JS = "OnWatermarkTextboxBlur('ctl00_ctl00_m_cpProgressWizard_ucPW_ucSN_ucSN_txtVIN')"
+VIN_INPUT_ID = VIN_INPUT.lstrip("#")
 SEARCH_BUTTON = "#ctl00_ctl00_m_cpProgressWizard_ucPW_btnNext"
 PLATE_VALUE_ID = "#ctl00_ctl00_m_cpProgressWizard_ucPW_ucR_ucRM_ucNevdisInformationForMultiple_rptMotorVehicles_ctl00_lblPlateNumberValue"
 LOGIN_BUTTON = "#ctl00_ctl00_m_cpContent_btnLogin"
+SERIAL_SEARCH_LINK = "li:has(> a:has-text('Search by serial number')) ul.childmenu li a"
+
+# In-page helpers, registered once per context via add_init_script (runs on every navigation)
+PPSR_INIT_JS = """window.__ppsr = {
+    focus: id => OnWatermarkTextboxFocus(id),
+    blur: id => OnWatermarkTextboxBlur(id),
+    // Tick a checkbox and fire its handlers; returns true if it changed state
+    check: el => {
+        if (el.checked) return false;
+        el.checked = true;
+        el.dispatchEvent(new Event('click', {bubbles: true}));
+        el.dispatchEvent(new Event('change', {bubbles: true}));
+        return true;
+    },
+    // Plate text by ID, falling back to the "Registration plate number:" dt/dd pair
+    plate: id => {
+        const el = document.getElementById(id);
+        if (el) return el.innerText.trim() || null;
+        const dt = [...document.querySelectorAll('dt')].find(d => d.textContent.includes('Registration plate number:'));
+        const dd = dt && dt.nextElementSibling;
+        return dd && dd.tagName === 'DD' ? dd.innerText.trim() || null : null;
+    },
+};"""
+VIN_WATERMARK_FOCUS_JS = "id => window.__ppsr.focus(id)"
+VIN_WATERMARK_BLUR_JS = "id => window.__ppsr.blur(id)"
+CHECK_BOX_JS = "el => window.__ppsr.check(el)"
+PLATE_TEXT_JS = "id => window.__ppsr.plate(id)"
+
+PLATE_VALUE_ELEMENT_ID = PLATE_VALUE_ID.lstrip("#")
+RESULTS_ANCHOR = f"{PLATE_VALUE_ID}, dt:has-text('Registration plate number:')"  # first element of the results page
+BLOCKED_RESOURCE_TYPES = ("image", "font", "media")
+BLOCKED_URL_PARTS = ("google-analytics", "googletagmanager", "doubleclick")
+
+# Browser launch / context options
+LAUNCH_ARGS = [
+    "--disable-blink-features=AutomationControlled",
+    "--disable-dev-shm-usage",
+    "--no-first-run",
+    "--no-default-browser-check",
+]
+CONTEXT_KWARGS = {
+    "viewport": {"width": 1280, "height": 800},
+    "user_agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/91.0.4472.124 Safari/537.36"
+    ),
+}
+
+# Max concurrent runs (one BrowserContext each)
+POOL_SIZE = _env_int("PPSR_POOL_SIZE", 2)
+# Saved login sessions (cookies + search page URL), one file per credential pair
+SESSION_DIR = os.path.join(LOG_DIR, "sessions")
+os.makedirs(SESSION_DIR, mode=0o700, exist_ok=True)
+os.chmod(SESSION_DIR, 0o700)  # makedirs' mode is masked by umask and ignored if the dir exists
+# Saved sessions older than this are deleted instead of reused
+SESSION_MAX_AGE_S = _env_int("PPSR_SESSION_MAX_AGE_S", 8 * 3600)
+
+def _load_session_secret() -> bytes:
+    # PPSR_SESSION_SECRET wins; otherwise generate one and keep it (0600) next to the sessions
+    # so reloads/restarts can still find the files they saved
+    env_secret = os.getenv("PPSR_SESSION_SECRET", "")
+    if env_secret:
+        return env_secret.encode("utf-8")
+    secret_path = os.path.join(SESSION_DIR, ".secret")
+    if not os.path.exists(secret_path):
+        tmp_path = f"{secret_path}.{uuid.uuid4().hex}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(secrets.token_bytes(32))
+        try:
+            os.link(tmp_path, secret_path)  # atomic create-if-absent with the content already written
+        except FileExistsError:
+            pass  # another worker created it first; use theirs
+        except OSError:
+            os.replace(tmp_path, secret_path)  # filesystem without hard links
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    with open(secret_path, "rb") as f:
+        return f.read()
+
+# Secret for session file names (HMAC key)
+SESSION_SECRET = _load_session_secret()
+
+# Finished job results not polled within this many seconds are discarded
+RESULT_TTL_S = 3600
+
+# Post-run cleanup tasks still in flight
+_background_tasks = set()
+
+# Debug artifacts (screenshots + Playwright trace)
+async def debug_screenshot(page, run_dir: str, name: str):
+    if DEBUG:
+        await page.screenshot(path=os.path.join(run_dir, name))
+
+# Navigation helper
+async def fast_goto(page, url: str, anchor_selector: str, request_id: str, timeout: int = 15000, attempts: int = 2):
+    # Only wait for the navigation to commit, then for the element the next step needs;
+    # re-issue the navigation if that element never shows up
+    for attempt in range(1, attempts + 1):
+        try:
+            await page.goto(url, wait_until="commit", timeout=2000)
+        except PWTimeout:
+            pass  # navigation keeps going in the browser; the anchor wait decides
+        try:
+            await page.wait_for_selector(anchor_selector, timeout=timeout)
+            return
+        except PWTimeout:
+            if attempt == attempts:
+                raise
+            logger.warning(f"[{request_id}] ⚠️ {anchor_selector} not found after {timeout}ms, retrying {url}")
 
 # Human-like helpers
 async def human_pause(min_ms: int = 900, max_ms: int = 1800):
+    if not HUMAN_LIKE:
+        return
     await asyncio.sleep(random.uniform(min_ms / 1000.0, max_ms / 1000.0))
 
 async def type_like_human(locator, text: str, min_delay_ms: int = 120, max_delay_ms: int = 200):
+    if FAST_INPUT:
+        # Single CDP call: fill() clears and sets the value in one go
+        await locator.fill(text)
+        return
     # Click, clear, and type with per-char delay
     await locator.click()
     try:
@@ -72,59 +232,231 @@ async def type_like_human(locator, text: str, min_delay_ms: int = 120, max_delay
         await locator.type(ch, delay=random.randint(min_delay_ms, max_delay_ms))
     await human_pause(450, 900)
 
-async def _slow_network(route):
-    # Add a small delay to every request
-    await asyncio.sleep(random.uniform(0.20, 0.55))
+def _is_blocked(request) -> bool:
+    return request.resource_type in BLOCKED_RESOURCE_TYPES or any(h in request.url for h in BLOCKED_URL_PARTS)
+
+async def _route_request(route, request):
+    # Drop bytes the form flow never needs; CSS stays since menu steps wait on visibility
+    if _is_blocked(request):
+        await route.abort()
+        return
+    if HUMAN_LIKE:
+        # Add a small delay to every request
+        await asyncio.sleep(random.uniform(0.20, 0.55))
     await route.continue_()
 
 # ------------------------
 # Request body schema
 # ------------------------
 class LoginRequest(BaseModel):
-    username: str = Field(..., example="test_user")
-    password: str = Field(..., example="secret_password")
-    vin_number: str = Field(..., example="JOB-12345")
+    # Unknown keys (e.g. "notes") are dropped; the model is never mutated, so no assignment validation
+    model_config = ConfigDict(extra="ignore", validate_assignment=False)
+
+    username: str = Field(..., examples=["test_user"])
+    password: str = Field(..., examples=["secret_password"])
+    vin_number: str = Field(..., examples=["JOB-12345"])
     plate_number: Optional[str] = None
 
+# ------------------------
+# Shared browser lifecycle
+# ------------------------
+async def new_browser_context(browser: Browser, storage_state: Optional[str] = None) -> BrowserContext:
+    context = await browser.new_context(**CONTEXT_KWARGS, storage_state=storage_state)
+    await context.add_init_script(PPSR_INIT_JS)
+    # Block heavy/irrelevant resources (and throttle the rest when HUMAN_LIKE)
+    await context.route("**/*", _route_request)
+    return context
+
+@app.on_event("startup")
+async def start_browser():
+    # Launch Chromium once; requests only open their own context
+    logger.info(f"Launching shared browser | headless={HEADLESS_MODE}")
+    app.state.pw = await async_playwright().start()
+    app.state.browser = await app.state.pw.chromium.launch(
+        headless=HEADLESS_MODE,
+        slow_mo=SLOW_MO_MS,  # slow down actions
+        args=LAUNCH_ARGS,
+    )
+    prune_sessions()
+    # Background jobs (requestId -> Task) and finished results (requestId -> (finished_at, dict))
+    app.state.jobs = {}
+    app.state.results = {}
+    # Bound concurrent runs; each run still gets its own fresh context
+    app.state.ctx_slots = asyncio.Semaphore(POOL_SIZE)
+    logger.info(f"Context slots ready | size={POOL_SIZE}")
+
+@app.on_event("shutdown")
+async def stop_browser():
+    # Cancel in-flight runs and let them and any finalize_run tasks close their contexts
+    # (and save DEBUG traces) before the browser goes away under them
+    jobs = list(app.state.jobs.values())
+    for task in jobs:
+        task.cancel()
+    await asyncio.gather(*jobs, return_exceptions=True)
+    await asyncio.gather(*_background_tasks, return_exceptions=True)
+    await app.state.browser.close()
+    await app.state.pw.stop()
+    logger.info("Shared browser closed")
+
 # ------------------------
 # Main Playwright function
 # ------------------------
-async def open_ppsr_site(data: LoginRequest, request_id: str):
+async def navigate_menu_by_hover(page, menu_root, request_id: str):
+    # Hover PPSR Search -> Search by serial number -> click first submenu item
+    ppsr_search = menu_root.locator("a:has-text('PPSR Search')").first
+    await ppsr_search.scroll_into_view_if_needed()
+    await ppsr_search.hover()
+    logger.info(f"[{request_id}] 🖱️ Hovered 'PPSR Search'")
+    await human_pause(900, 1600)
+
+    first_level_menu = menu_root.locator("li:has(> a:has-text('PPSR Search')) > ul.childmenu").first
+    await first_level_menu.wait_for(state="visible", timeout=10000)
+
+    search_by_serial = first_level_menu.locator("a:has-text('Search by serial number')").first
+    await search_by_serial.hover()
+    logger.info(f"[{request_id}] 🖱️ Hovered 'Search by serial number'")
+    await human_pause(900, 1600)
+
+    second_level_menu = search_by_serial.locator("xpath=..").locator("ul.childmenu").first
+    if await second_level_menu.count() == 0:
+        second_level_menu = menu_root.locator("li:has(> a:has-text('Search by serial number')) > ul.childmenu").first
+    await second_level_menu.wait_for(state="visible", timeout=10000)
+
+    first_item = second_level_menu.locator("li a").first
+    first_item_text = await first_item.inner_text()
+    await first_item.click()
+    logger.info(f"[{request_id}] ✅ Clicked first submenu item: {first_item_text.strip()}")
+
+def session_state_path(username: str, password: str) -> str:
+    # Keyed on both credentials so a session is only reused by whoever can log in with it;
+    # HMAC with a server-side secret so the file name can't be used to verify password guesses
+    key = hmac.new(SESSION_SECRET, f"{username}\0{password}".encode("utf-8"), hashlib.sha256).hexdigest()[:32]
+    return os.path.join(SESSION_DIR, f"{key}.state.json")
+
+def discard_session(state_path: str):
+    try:
+        os.remove(state_path)
+    except OSError:
+        pass
+
+def prune_sessions():
+    # Remove saved sessions (and stray temp files) past SESSION_MAX_AGE_S
+    now = time.time()
+    for name in os.listdir(SESSION_DIR):
+        if not name.endswith((".state.json", ".tmp")):
+            continue
+        path = os.path.join(SESSION_DIR, name)
+        try:
+            if now - os.path.getmtime(path) > SESSION_MAX_AGE_S:
+                os.remove(path)
+        except OSError:
+            pass
+
+def fresh_session_state(state_path: str, request_id: str) -> Optional[str]:
+    # Path to pass as storage_state, or None if there is no usable saved session
+    if not os.path.exists(state_path):
+        return None
+    if time.time() - os.path.getmtime(state_path) > SESSION_MAX_AGE_S:
+        logger.info(f"[{request_id}] Saved session too old; logging in")
+        discard_session(state_path)
+        return None
+    return state_path
+
+async def resume_session(context: BrowserContext, page, state_path: str, request_id: str) -> bool:
+    # Context was created with storage_state=state_path; open the search page and check we're
+    # still logged in. False means a full login is needed
+    try:
+        with open(state_path, encoding="utf-8") as f:
+            state = json.load(f)
+        # Expired sessions redirect to /Login; both anchors are page-specific IDs, so whichever
+        # one matched tells us which page we landed on
+        await fast_goto(page, state["searchUrl"], f"{VIN_INPUT}, {LOGIN_BUTTON}", request_id, timeout=10000, attempts=1)
+        if await page.locator(VIN_INPUT).count() == 0:
+            raise ValueError(f"redirected to {page.url}")
+        logger.info(f"[{request_id}] ♻️ Reused saved session, skipped login")
+        return True
+    except Exception as e:
+        logger.info(f"[{request_id}] Saved session not usable ({e}); logging in")
+        await context.clear_cookies()
+        discard_session(state_path)
+        return False
+
+async def save_session(context: BrowserContext, page, state_path: str, request_id: str):
+    try:
+        state = await context.storage_state()
+        state["searchUrl"] = page.url  # extra key; ignored when Playwright loads storage_state
+        tmp_path = f"{state_path}.{request_id}.tmp"
+        # Live session cookies: owner-only from the moment the file exists
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, state_path)  # atomic, so concurrent runs never read a partial file
+        logger.info(f"[{request_id}] 💾 Session saved for reuse")
+    except Exception as e:
+        logger.warning(f"[{request_id}] ⚠️ Could not save session: {e}")
+
+async def release_context(context: BrowserContext, ctx_slots: asyncio.Semaphore, request_id: str, trace_path: Optional[str] = None):
+    # Close the run's context (pages, storage, cache go with it) and free its slot
+    try:
+        if DEBUG:
+            try:
+                await context.tracing.stop(path=trace_path)
+            except Exception as e:
+                logger.warning(f"[{request_id}] ⚠️ Could not save trace: {e}")
+        await context.close()
+        logger.info(f"[{request_id}] ✅ Browser context closed")
+    except Exception as e:
+        logger.warning(f"[{request_id}] ⚠️ Could not close browser context: {e}")
+    finally:
+        ctx_slots.release()
+
+async def finalize_run(context: BrowserContext, page, ctx_slots: asyncio.Semaphore, request_id: str, run_dir: str, trace_path: Optional[str]):
+    # Runs after the result is returned: last screenshot, trace zip, context reset
+    try:
+        await human_pause(1800, 3000)
+        await debug_screenshot(page, run_dir, "ppsr_after_login.png")
+    except Exception as e:
+        logger.warning(f"[{request_id}] ⚠️ Final screenshot failed: {e}")
+    finally:
+        await release_context(context, ctx_slots, request_id, trace_path)
+
+async def open_ppsr_site(data: LoginRequest, request_id: str, browser: Browser, ctx_slots: asyncio.Semaphore):
     username = data.username
     password = data.password
 
     # per-request run folder
     run_dir = os.path.join(LOG_DIR, request_id)
-    os.makedirs(run_dir, exist_ok=True)
+    if DEBUG:
+        os.makedirs(run_dir, exist_ok=True)
     logger.info(f"[{request_id}] Start run | user={username} | vin={data.vin_number}")
-    logger.info(f"[{request_id}] Logs dir: {run_dir}")
-    headless_mode = str(os.getenv("HEADLESS", "true")).strip().lower() in ("1", "true", "yes", "on")
-    logger.info(f"[{request_id}] Headless mode: {headless_mode}")
-
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(
-            headless=headless_mode,
-            slow_mo=SLOW_MO_MS,  # slow down actions
-            args=[
-                "--disable-blink-features=AutomationControlled",
-                "--disable-dev-shm-usage",
-                "--no-first-run",
-                "--no-default-browser-check",
-            ],
-        )
-
-        context = await browser.new_context(
-            viewport={"width": 1280, "height": 800},
-            user_agent=(
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/91.0.4472.124 Safari/537.36"
-            ),
-        )
-        # Slightly throttle network to mimic human usage
-        await context.route("**/*", _slow_network)
-        # Start Playwright tracing
-        await context.tracing.start(screenshots=True, snapshots=True, sources=True)
+    if DEBUG:
+        logger.info(f"[{request_id}] Logs dir: {run_dir}")
+
+    # Warm path: a saved session for these credentials is loaded straight into the new context
+    state_path = session_state_path(username, password)
+    saved_state = fresh_session_state(state_path, request_id)
+
+    # Wait for a free slot (extra requests queue here), then open a fresh isolated context
+    await ctx_slots.acquire()
+    try:
+        try:
+            context = await new_browser_context(browser, saved_state)
+        except Exception as e:
+            if saved_state is None:
+                raise
+            logger.info(f"[{request_id}] Saved session not loadable ({e}); logging in")
+            discard_session(state_path)
+            saved_state = None
+            context = await new_browser_context(browser)
+    except Exception:
+        ctx_slots.release()
+        raise
+    page = None
+    handed_off = False  # True once finalize_run owns the context
+    try:
+        if DEBUG:
+            # Start Playwright tracing
+            await context.tracing.start(screenshots=True, snapshots=True, sources=True)
 
         page = await context.new_page()
         # Safety: accept native JS dialogs if they appear
@@ -135,240 +467,228 @@ async def open_ppsr_site(data: LoginRequest, request_id: str):
         # Capture console logs and request failures
         page.on("console", lambda msg: logger.info(f"[{request_id}] console.{msg.type}: {msg.text}"))
         page.on("pageerror", lambda err: logger.error(f"[{request_id}] pageerror: {err}"))
-        page.on("requestfailed", lambda req: logger.warning(f"[{request_id}] requestfailed: {req.method} {req.url} -> {req.failure}"))
+        # Requests aborted by _route_request also fire requestfailed; don't log those
+        page.on("requestfailed", lambda req: None if _is_blocked(req) else logger.warning(f"[{request_id}] requestfailed: {req.method} {req.url} -> {req.failure}"))
 
-        url = "https://transact.ppsr.gov.au/ppsr/Login"
-        logger.info(f"[{request_id}] 🌐 Opening: {url}")
+        if not (saved_state and await resume_session(context, page, state_path, request_id)):
+            url = "https://transact.ppsr.gov.au/ppsr/Login"
+            logger.info(f"[{request_id}] 🌐 Opening: {url}")
 
-        try:
-            await page.goto(url, wait_until="domcontentloaded", timeout=10000)
-            logger.info(f"[{request_id}] ✅ Page loaded successfully")
-        except Exception as e:
-            await browser.close()
-            raise Exception(f"Failed to load page: {e}")
+            # Navigate and wait for the login form itself rather than a load event
+            try:
+                await fast_goto(page, url, LOGIN_FORM, request_id, timeout=10000)
+                logger.info(f"[{request_id}] ✅ Page loaded, login form detected")
+            except Exception as e:
+                await debug_screenshot(page, run_dir, "ppsr_form_not_found.png")
+                raise Exception(f"Login form not found: {e}")
 
-        await page.screenshot(path=os.path.join(run_dir, "ppsr_initial.png"))
-        await human_pause(1200, 2200)
+            await debug_screenshot(page, run_dir, "ppsr_initial.png")
+            await human_pause(1200, 2200)
 
-        # Wait for form
-        try:
-            await page.wait_for_selector("input[type='text'], input[type='password']", timeout=10000)
-            logger.info(f"[{request_id}] ✅ Login form detected")
-        except Exception:
-            await page.screenshot(path=os.path.join(run_dir, "ppsr_form_not_found.png"))
-            await browser.close()
-            raise Exception("Login form not found")
-
-        # Fill username (human-like typing)
-        username_field = page.locator("input[type='text']").first
-        if await username_field.count() > 0:
-            await type_like_human(username_field, username, 130, 210)
-        else:
-            await browser.close()
-            raise Exception("Username field not found")
-
-        await human_pause(1200, 2400)
-
-        # Fill password (human-like typing)
-        password_field = page.locator("input[type='password']").first
-        if await password_field.count() > 0:
-            await type_like_human(password_field, password, 130, 210)
-        else:
-            await browser.close()
-            raise Exception("Password field not found")
-
-        await human_pause(1200, 2400)
-
-        # Tick declaration checkbox (make it true)
-        try:
-            await page.wait_for_selector(DECLARATION_CHECKBOX, timeout=10000)
-            if not await page.is_checked(DECLARATION_CHECKBOX):
-                await page.check(DECLARATION_CHECKBOX)
-                logger.info(f"[{request_id}] ☑️  Declaration checkbox checked")
+            # Fill username (human-like typing)
+            username_field = page.locator("input[type='text']").first
+            if await username_field.count() > 0:
+                await type_like_human(username_field, username, 130, 210)
             else:
-                logger.info(f"[{request_id}] ☑️  Declaration checkbox already checked")
-        except Exception as e:
-            await page.screenshot(path=os.path.join(run_dir, "ppsr_checkbox_error.png"))
-            await browser.close()
-            raise Exception(f"Declaration checkbox not found or not clickable: {e}")
+                raise Exception("Username field not found")
 
-        await human_pause(1400, 2600)
+            await human_pause(1200, 2400)
 
-        logger.info(f"[{request_id}] 🔐 Credentials entered for: {username}")
+            # Fill password (human-like typing)
+            password_field = page.locator("input[type='password']").first
+            if await password_field.count() > 0:
+                await type_like_human(password_field, password, 130, 210)
+            else:
+                raise Exception("Password field not found")
 
-        # Click login (prefer explicit login button, fallback to generic submit/Enter)
-        try:
-            # prefer explicit ID button
-            await page.wait_for_selector(LOGIN_BUTTON, timeout=10000)
-            login_btn = page.locator(LOGIN_BUTTON).first
-            await login_btn.scroll_into_view_if_needed()
-            try:
-                # Click and wait for navigation/network idle if it occurs
-                await asyncio.gather(
-                    page.wait_for_load_state("networkidle", timeout=30000),
-                    login_btn.click()
-                )
-            except Exception:
-                # fallback if no navigation happens
-                await login_btn.click(force=True)
-                await human_pause(1600, 2600)
-            logger.info(f"[{request_id}] 🔐 Login button clicked (explicit)")
-        except Exception as e:
-            logger.warning(f"[{request_id}] ⚠️ Explicit login button not available: {e}. Falling back...")
+            await human_pause(1200, 2400)
+
+            # Tick declaration checkbox (make it true)
             try:
-                # fallback: generic submit or Enter
-                generic = await page.query_selector("input[type='submit'], button[type='submit']")
-                if generic:
-                    await generic.click()
-                    logger.info(f"[{request_id}] 🔐 Login button clicked (generic)")
+                if await page.locator(DECLARATION_CHECKBOX).evaluate(CHECK_BOX_JS, timeout=10000):
+                    logger.info(f"[{request_id}] ☑️  Declaration checkbox checked")
                 else:
-                    await page.keyboard.press("Enter")
-                    logger.info(f"[{request_id}] 🔐 Pressed Enter to submit")
-            except Exception as ex:
-                logger.error(f"[{request_id}] ⚠️ Login fallback failed: {ex}")
+                    logger.info(f"[{request_id}] ☑️  Declaration checkbox already checked")
+            except Exception as e:
+                await debug_screenshot(page, run_dir, "ppsr_checkbox_error.png")
+                raise Exception(f"Declaration checkbox not found or not clickable: {e}")
 
-        # Give time for modal/navigation to appear
-        await human_pause(1600, 2600)
+            await human_pause(1400, 2600)
 
-        # -------------------------------
-        # Navigate: hover PPSR Search -> click first submenu
-        # -------------------------------
-        try:
-            await page.wait_for_selector(MAIN_MENU, timeout=10000)
-            menu_root = page.locator(MAIN_MENU)
-
-            ppsr_search = menu_root.locator("a:has-text('PPSR Search')").first
-            await ppsr_search.scroll_into_view_if_needed()
-            await ppsr_search.hover()
-            logger.info(f"[{request_id}] 🖱️ Hovered 'PPSR Search'")
-            await human_pause(900, 1600)
-
-            first_level_menu = menu_root.locator("li:has(> a:has-text('PPSR Search')) > ul.childmenu").first
-            await first_level_menu.wait_for(state="visible", timeout=10000)
-
-            search_by_serial = first_level_menu.locator("a:has-text('Search by serial number')").first
-            await search_by_serial.hover()
-            logger.info(f"[{request_id}] 🖱️ Hovered 'Search by serial number'")
-            await human_pause(900, 1600)
-
-            second_level_menu = search_by_serial.locator("xpath=..").locator("ul.childmenu").first
-            if await second_level_menu.count() == 0:
-                second_level_menu = menu_root.locator("li:has(> a:has-text('Search by serial number')) > ul.childmenu").first
-            await second_level_menu.wait_for(state="visible", timeout=10000)
-
-            first_item = second_level_menu.locator("li a").first
-            first_item_text = await first_item.inner_text()
-            await first_item.click()
-            logger.info(f"[{request_id}] ✅ Clicked first submenu item: {first_item_text.strip()}")
-
-            await page.wait_for_load_state("networkidle")
-            await human_pause(1200, 2200)
-            logger.info(f"[{request_id}] 🔗 Landed on: {page.url}")
-            await page.screenshot(path=os.path.join(run_dir, "ppsr_after_menu_nav.png"))
-        except Exception as e:
-            logger.error(f"[{request_id}] ⚠️ Menu navigation failed: {e}")
-            await page.screenshot(path=os.path.join(run_dir, "ppsr_nav_error.png"))
+            logger.info(f"[{request_id}] 🔐 Credentials entered for: {username}")
+
+            # Click login (prefer explicit login button, fallback to generic submit/Enter)
+            try:
+                # prefer explicit ID button
+                login_btn = page.locator(LOGIN_BUTTON).first
+                await login_btn.scroll_into_view_if_needed(timeout=10000)
+                try:
+                    # Click and wait for the main menu the next step needs
+                    await login_btn.click()
+                    await page.wait_for_selector(MAIN_MENU, timeout=30000)
+                except Exception:
+                    # fallback if no navigation happens
+                    await login_btn.click(force=True)
+                    await human_pause(1600, 2600)
+                logger.info(f"[{request_id}] 🔐 Login button clicked (explicit)")
+            except Exception as e:
+                logger.warning(f"[{request_id}] ⚠️ Explicit login button not available: {e}. Falling back...")
+                try:
+                    # fallback: generic submit or Enter
+                    generic = await page.query_selector("input[type='submit'], button[type='submit']")
+                    if generic:
+                        await generic.click()
+                        logger.info(f"[{request_id}] 🔐 Login button clicked (generic)")
+                    else:
+                        await page.keyboard.press("Enter")
+                        logger.info(f"[{request_id}] 🔐 Pressed Enter to submit")
+                except Exception as ex:
+                    logger.error(f"[{request_id}] ⚠️ Login fallback failed: {ex}")
+
+            # Give time for modal/navigation to appear
+            await human_pause(1600, 2600)
+
+            # -------------------------------
+            # Navigate: PPSR Search -> Search by serial number -> first submenu
+            # -------------------------------
+            try:
+                await page.wait_for_selector(MAIN_MENU, timeout=10000)
+                menu_root = page.locator(MAIN_MENU)
+
+                try:
+                    # Submenu items are plain links: read the href and go straight there
+                    href = await menu_root.locator(SERIAL_SEARCH_LINK).first.get_attribute("href", timeout=5000)
+                    if not href or href.startswith(("#", "javascript:")):
+                        raise ValueError(f"unusable submenu href: {href!r}")
+                    await fast_goto(page, urljoin(page.url, href), VIN_INPUT, request_id, timeout=15000)
+                    logger.info(f"[{request_id}] ✅ Navigated directly to submenu link: {href}")
+                except Exception as e:
+                    logger.warning(f"[{request_id}] ⚠️ Direct submenu navigation failed: {e}. Falling back to hover...")
+                    await navigate_menu_by_hover(page, menu_root, request_id)
+                    await page.wait_for_selector(VIN_INPUT, timeout=15000)
+                await human_pause(1200, 2200)
+                logger.info(f"[{request_id}] 🔗 Landed on: {page.url}")
+                await debug_screenshot(page, run_dir, "ppsr_after_menu_nav.png")
+            except Exception as e:
+                logger.error(f"[{request_id}] ⚠️ Menu navigation failed: {e}")
+                await debug_screenshot(page, run_dir, "ppsr_nav_error.png")
+
+            # Persist cookies + search URL so the next request with these credentials skips login
+            if await page.locator(VIN_INPUT).count() > 0:
+                await save_session(context, page, state_path, request_id)
 
         # Fill VIN and tick declaration on the search page
         try:
-            await page.wait_for_selector(VIN_INPUT, timeout=10000)
             vin_input = page.locator(VIN_INPUT)
-            await vin_input.scroll_into_view_if_needed()
+            await vin_input.scroll_into_view_if_needed(timeout=10000)
             try:
-                await page.evaluate(VIN_WATERMARK_FOCUS_JS)
+                await page.evaluate(VIN_WATERMARK_FOCUS_JS, VIN_INPUT_ID)
             except Exception:
                 pass
-            await vin_input.click()
-            try:
-                await vin_input.fill("")
-            except Exception:
-                await vin_input.press("Control+A")
-                await vin_input.press("Backspace")
-            # Slow, human-like typing for VIN
+            # type_like_human clicks/clears the field itself (or fills it in one call)
             await type_like_human(vin_input, data.vin_number, 140, 220)
             try:
-                await page.evaluate(VIN_WATERMARK_BLUR_JS)
+                await page.evaluate(VIN_WATERMARK_BLUR_JS, VIN_INPUT_ID)
             except Exception:
                 pass
             await human_pause(900, 1500)
             logger.info(f"[{request_id}] 🔎 Entered VIN: {data.vin_number[:6]}********")
 
-            await page.wait_for_selector(SEARCH_DECLARATION_CB, timeout=5000)
-            if not await page.is_checked(SEARCH_DECLARATION_CB):
-                await page.check(SEARCH_DECLARATION_CB)
+            if await page.locator(SEARCH_DECLARATION_CB).evaluate(CHECK_BOX_JS, timeout=5000):
                 logger.info(f"[{request_id}] ☑️  Search declaration checkbox checked")
             else:
                 logger.info(f"[{request_id}] ☑️  Search declaration checkbox already checked")
 
             await human_pause(1100, 1900)
-            await page.screenshot(path=os.path.join(run_dir, "ppsr_after_vin_and_decl.png"))
+            await debug_screenshot(page, run_dir, "ppsr_after_vin_and_decl.png")
         except Exception as e:
             logger.error(f"[{request_id}] ⚠️ VIN/Declaration step failed: {e}")
-            await page.screenshot(path=os.path.join(run_dir, "ppsr_vin_decl_error.png"))
+            await debug_screenshot(page, run_dir, "ppsr_vin_decl_error.png")
 
         # Click the "Search" button
         try:
-            await page.wait_for_selector(SEARCH_BUTTON, timeout=5000)
             search_btn = page.locator(SEARCH_BUTTON)
-            await search_btn.scroll_into_view_if_needed()
+            await search_btn.scroll_into_view_if_needed(timeout=5000)
+            await search_btn.click()
+            logger.info(f"[{request_id}] 🔍 Clicked Search")
             try:
-                await asyncio.gather(
-                    page.wait_for_load_state("networkidle", timeout=10000),
-                    search_btn.click()
-                )
+                await page.wait_for_selector(RESULTS_ANCHOR, timeout=10000)
             except Exception:
-                await search_btn.click()
+                # Don't re-click (each search is billable); extraction below waits again
                 await human_pause(1600, 2600)
-            logger.info(f"[{request_id}] 🔍 Clicked Search")
             await human_pause(1300, 2200)
-            await page.screenshot(path=os.path.join(run_dir, "ppsr_after_search_click.png"))
+            await debug_screenshot(page, run_dir, "ppsr_after_search_click.png")
         except Exception as e:
             logger.error(f"[{request_id}] ⚠️ Search button click failed: {e}")
-            await page.screenshot(path=os.path.join(run_dir, "ppsr_search_click_error.png"))
+            await debug_screenshot(page, run_dir, "ppsr_search_click_error.png")
 
         # Extract Registration plate number from results
+        plate_number = None
         try:
             # Small settle wait
             await human_pause(1300, 2100)
-            plate_loc = page.locator(PLATE_VALUE_ID)
-            if await plate_loc.count() > 0:
-                await plate_loc.first.wait_for(state="visible", timeout=10000)
-                plate_number = (await plate_loc.first.inner_text()).strip()
-            else:
-                dt_label = page.locator("dt:has-text('Registration plate number:')").first
-                await dt_label.wait_for(state="visible", timeout=10000)
-                dd_value = dt_label.locator("xpath=following-sibling::dd[1]")
-                plate_number = (await dd_value.inner_text()).strip()
+            # One CDP round-trip resolves the plate by ID or via the dt/dd fallback
+            plate_number = await page.evaluate(PLATE_TEXT_JS, PLATE_VALUE_ELEMENT_ID)
+            if not plate_number:
+                handle = await page.wait_for_function(PLATE_TEXT_JS, arg=PLATE_VALUE_ELEMENT_ID, timeout=10000)
+                plate_number = await handle.json_value()
             logger.info(f"[{request_id}] 📛 Registration plate number: {plate_number}")
-            await page.screenshot(path=os.path.join(run_dir, "ppsr_plate_extracted.png"))
+            await debug_screenshot(page, run_dir, "ppsr_plate_extracted.png")
         except Exception as e:
             logger.error(f"[{request_id}] ⚠️ Could not extract plate number: {e}")
-            await page.screenshot(path=os.path.join(run_dir, "ppsr_plate_extract_error.png"))
-
-        await human_pause(1800, 3000)
-        await page.screenshot(path=os.path.join(run_dir, "ppsr_after_login.png"))
-        # Save Playwright trace
-        trace_path = os.path.join(run_dir, f"trace-{request_id}.zip")
-        await context.tracing.stop(path=trace_path)
+            await debug_screenshot(page, run_dir, "ppsr_plate_extract_error.png")
 
-        logger.info(f"[{request_id}] ✅ Browser closed after run")
-        await browser.close()
+        trace_path = os.path.join(run_dir, f"trace-{request_id}.zip") if DEBUG else None
+        # Plate is in hand: final screenshot, trace zip and context reset happen off the response path
+        finalize_task = asyncio.create_task(finalize_run(context, page, ctx_slots, request_id, run_dir, trace_path))
+        _background_tasks.add(finalize_task)  # strong ref so the task isn't GC'd
+        finalize_task.add_done_callback(_background_tasks.discard)
+        handed_off = True
 
         return {
             "status": "success",
             "message": "Login attempt completed",
             "plateNumber": plate_number if plate_number else None,
             "requestId": request_id,
-            "logsDir": run_dir,
+            "logsDir": run_dir if DEBUG else None,
             "trace": trace_path,
         }
+    finally:
+        if not handed_off:
+            await release_context(context, ctx_slots, request_id)
 
 # ------------------------
-# FastAPI endpoint (POST)
+# FastAPI endpoints (POST job + GET status)
 # ------------------------
+def _prune_results():
+    # Finished results are kept for RESULT_TTL_S so repeated polls get the same answer
+    now = time.monotonic()
+    for rid in [rid for rid, (finished_at, _) in app.state.results.items() if now - finished_at > RESULT_TTL_S]:
+        del app.state.results[rid]
+
+def _store_result(request_id: str, result: Dict[str, Any]):
+    _prune_results()
+    app.state.results[request_id] = (time.monotonic(), result)
+
+def _on_job_done(request_id: str, task: asyncio.Task):
+    # Move the finished job from app.state.jobs into app.state.results
+    app.state.jobs.pop(request_id, None)
+    if task.cancelled():
+        _store_result(request_id, {"status": "error", "message": "Job cancelled", "requestId": request_id})
+        logger.warning(f"[{request_id}] ❌ Job cancelled")
+    elif task.exception() is not None:
+        e = task.exception()
+        _store_result(request_id, {"status": "error", "message": str(e), "requestId": request_id})
+        logger.error(f"[{request_id}] ❌ Error: {e}", exc_info=e)
+    else:
+        _store_result(request_id, task.result())
+        logger.info(f"[{request_id}] Job completed")
+
 @app.post("/open_ppsr")
 async def open_ppsr(request: LoginRequest):
     """
+    Queues a run and returns immediately; poll GET /open_ppsr/{requestId} for the result.
+
     Example:
     POST http://127.0.0.1:8000/open_ppsr
     Body:
@@ -379,15 +699,23 @@ async def open_ppsr(request: LoginRequest):
         "notes": "Initial test run"
     }
     """
-    try:
-        request_id = uuid.uuid4().hex[:8]
-        logger.info(f"[{request_id}] HTTP /open_ppsr received")
-        result = await open_ppsr_site(request, request_id)
-        logger.info(f"[{request_id}] HTTP /open_ppsr completed")
+    # Full 128-bit id: it is the only thing needed to read this job's result
+    request_id = uuid.uuid4().hex
+    logger.info(f"[{request_id}] HTTP /open_ppsr received")
+    task = asyncio.create_task(open_ppsr_site(request, request_id, app.state.browser, app.state.ctx_slots))
+    app.state.jobs[request_id] = task  # strong ref so the task isn't GC'd
+    task.add_done_callback(lambda t: _on_job_done(request_id, t))
+    return {"requestId": request_id, "status": "pending"}
+
+@app.get("/open_ppsr/{request_id}")
+async def open_ppsr_status(request_id: str):
+    _prune_results()
+    if request_id in app.state.results:
+        _, result = app.state.results[request_id]
         return result
-    except Exception as e:
-        logger.exception(f"[{request_id}] ❌ Error: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    if request_id in app.state.jobs:
+        return {"requestId": request_id, "status": "pending"}
+    raise HTTPException(status_code=404, detail=f"Unknown requestId: {request_id}")
 
 # Health check endpoint
 @app.get("/")
@@ -398,4 +726,11 @@ async def root():
 # Run server
 # ------------------------
 if __name__ == "__main__":
-    uvicorn.run("ppsr:app", host="0.0.0.0", port=8000, reload=True)
+    uvicorn.run(
+        "ppsr:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="asyncio" if platform.system() == "Windows" else "uvloop",
+        http="httptools",
+        reload=True,
+    )
@@ -0,0 +1,293 @@
+import asyncio
+import hashlib
+import json
+import os
+import stat
+import time
+
+import pytest
+from httpx import AsyncClient
+
+import ppsr
+
+LOGIN_BODY = {
+    "username": "test_user",
+    "password": "secret",
+    "vin_number": "1HGCM82633A123456",
+}
+
+
+@pytest.fixture(autouse=True)
+def app_state():
+    # The startup hook (which launches Chromium) is not run by AsyncClient, so set up state by hand
+    ppsr.app.state.browser = None
+    ppsr.app.state.ctx_slots = None
+    ppsr.app.state.jobs = {}
+    ppsr.app.state.results = {}
+    yield ppsr.app.state
+
+
+async def _finish(request_id: str):
+    await asyncio.gather(ppsr.app.state.jobs[request_id], return_exceptions=True)
+    await asyncio.sleep(0)  # let the done-callback run
+
+
+@pytest.mark.asyncio
+async def test_open_ppsr_pending_then_result(monkeypatch):
+    release = asyncio.Event()
+
+    async def fake_site(data, request_id, browser, ctx_slots):
+        await release.wait()
+        return {"status": "success", "plateNumber": "ABC123", "requestId": request_id}
+
+    monkeypatch.setattr(ppsr, "open_ppsr_site", fake_site)
+
+    async with AsyncClient(app=ppsr.app, base_url="http://test") as client:
+        resp = await client.post("/open_ppsr", json=LOGIN_BODY)
+        assert resp.status_code == 200
+        request_id = resp.json()["requestId"]
+        assert resp.json()["status"] == "pending"
+        assert len(request_id) == 32
+
+        resp = await client.get(f"/open_ppsr/{request_id}")
+        assert resp.json() == {"requestId": request_id, "status": "pending"}
+
+        release.set()
+        await _finish(request_id)
+
+        resp = await client.get(f"/open_ppsr/{request_id}")
+        assert resp.status_code == 200
+        assert resp.json()["status"] == "success"
+        assert resp.json()["plateNumber"] == "ABC123"
+
+        # Polling again (e.g. a client retry) returns the same result
+        resp = await client.get(f"/open_ppsr/{request_id}")
+        assert resp.status_code == 200
+        assert resp.json()["plateNumber"] == "ABC123"
+
+
+@pytest.mark.asyncio
+async def test_open_ppsr_error_result(monkeypatch):
+    async def fake_site(data, request_id, browser, ctx_slots):
+        raise Exception("Login form not found")
+
+    monkeypatch.setattr(ppsr, "open_ppsr_site", fake_site)
+
+    async with AsyncClient(app=ppsr.app, base_url="http://test") as client:
+        resp = await client.post("/open_ppsr", json=LOGIN_BODY)
+        request_id = resp.json()["requestId"]
+        await _finish(request_id)
+
+        resp = await client.get(f"/open_ppsr/{request_id}")
+        assert resp.json() == {"status": "error", "message": "Login form not found", "requestId": request_id}
+
+
+@pytest.mark.asyncio
+async def test_open_ppsr_status_unknown_id():
+    async with AsyncClient(app=ppsr.app, base_url="http://test") as client:
+        resp = await client.get("/open_ppsr/deadbeef")
+        assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_unpolled_results_expire(monkeypatch, app_state):
+    async def fake_site(data, request_id, browser, ctx_slots):
+        return {"status": "success", "requestId": request_id}
+
+    monkeypatch.setattr(ppsr, "open_ppsr_site", fake_site)
+    app_state.results["stale"] = (time.monotonic() - ppsr.RESULT_TTL_S - 1, {"status": "success"})
+
+    async with AsyncClient(app=ppsr.app, base_url="http://test") as client:
+        resp = await client.post("/open_ppsr", json=LOGIN_BODY)
+        await _finish(resp.json()["requestId"])
+
+    assert "stale" not in app_state.results
+
+
+@pytest.mark.asyncio
+async def test_expired_result_returns_404(app_state):
+    app_state.results["old"] = (time.monotonic() - ppsr.RESULT_TTL_S - 1, {"status": "success"})
+
+    async with AsyncClient(app=ppsr.app, base_url="http://test") as client:
+        resp = await client.get("/open_ppsr/old")
+        assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_shutdown_waits_for_jobs_and_cleanup(monkeypatch, app_state):
+    events = []
+
+    async def fake_site(data, request_id, browser, ctx_slots):
+        try:
+            await asyncio.Event().wait()
+        finally:
+            events.append("job cleaned up")
+
+    async def fake_finalize():
+        await asyncio.sleep(0.01)
+        events.append("finalize done")
+
+    class FakeBrowser:
+        async def close(self):
+            events.append("browser closed")
+
+    class FakePlaywright:
+        async def stop(self):
+            pass
+
+    monkeypatch.setattr(ppsr, "open_ppsr_site", fake_site)
+    app_state.browser = FakeBrowser()
+    app_state.pw = FakePlaywright()
+
+    async with AsyncClient(app=ppsr.app, base_url="http://test") as client:
+        await client.post("/open_ppsr", json=LOGIN_BODY)
+    await asyncio.sleep(0)  # let the job start running
+    cleanup = asyncio.create_task(fake_finalize())
+    ppsr._background_tasks.add(cleanup)
+    cleanup.add_done_callback(ppsr._background_tasks.discard)
+
+    await ppsr.stop_browser()
+
+    assert events[-1] == "browser closed"
+    assert sorted(events[:-1]) == ["finalize done", "job cleaned up"]
+
+
+# ------------------------
+# Saved login sessions
+# ------------------------
+@pytest.fixture
+def session_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(ppsr, "SESSION_DIR", str(tmp_path))
+    monkeypatch.setattr(ppsr, "SESSION_SECRET", b"test-secret")
+    return tmp_path
+
+
+class StubContext:
+    def __init__(self, state=None):
+        self.state = state or {"cookies": [{"name": "ASP.NET_SessionId", "value": "abc"}], "origins": []}
+        self.cookies_cleared = False
+
+    async def storage_state(self):
+        return dict(self.state)
+
+    async def clear_cookies(self):
+        self.cookies_cleared = True
+
+
+class StubLocator:
+    def __init__(self, count):
+        self._count = count
+
+    async def count(self):
+        return self._count
+
+
+class StubPage:
+    def __init__(self, url, vin_present=True):
+        self.url = url
+        self.vin_present = vin_present
+
+    async def goto(self, url, **kwargs):
+        if not self.vin_present:
+            self.url = "https://transact.ppsr.gov.au/ppsr/Login"
+
+    async def wait_for_selector(self, selector, **kwargs):
+        pass
+
+    def locator(self, selector):
+        return StubLocator(1 if self.vin_present and selector == ppsr.VIN_INPUT else 0)
+
+
+def _write_state(path, search_url="https://transact.ppsr.gov.au/ppsr/SearchBySerialNumber"):
+    path.write_text(json.dumps({"cookies": [], "origins": [], "searchUrl": search_url}), encoding="utf-8")
+
+
+def test_session_state_path_depends_on_secret_and_credentials(session_dir, monkeypatch):
+    path = ppsr.session_state_path("user", "pass")
+    assert os.path.dirname(path) == str(session_dir)
+    assert ppsr.session_state_path("user", "pass") == path
+    assert ppsr.session_state_path("user", "other") != path
+    assert ppsr.session_state_path("other", "pass") != path
+    assert hashlib.sha256(b"user\0pass").hexdigest()[:32] not in path
+
+    monkeypatch.setattr(ppsr, "SESSION_SECRET", b"another-secret")
+    assert ppsr.session_state_path("user", "pass") != path
+
+
+@pytest.mark.asyncio
+async def test_save_session_writes_owner_only_file_atomically(session_dir):
+    state_path = ppsr.session_state_path("user", "pass")
+    page = StubPage("https://transact.ppsr.gov.au/ppsr/SearchBySerialNumber")
+
+    await ppsr.save_session(StubContext(), page, state_path, "req1")
+    await ppsr.save_session(StubContext({"cookies": [], "origins": []}), page, state_path, "req2")
+
+    with open(state_path, encoding="utf-8") as f:
+        saved = json.load(f)
+    assert saved == {"cookies": [], "origins": [], "searchUrl": page.url}
+    if os.name == "posix":
+        assert stat.S_IMODE(os.stat(state_path).st_mode) == 0o600
+    assert not [name for name in os.listdir(session_dir) if name.endswith(".tmp")]
+
+
+@pytest.mark.asyncio
+async def test_resume_session_reuses_valid_session(session_dir):
+    state_path = ppsr.session_state_path("user", "pass")
+    _write_state(session_dir / os.path.basename(state_path))
+    context = StubContext()
+
+    assert await ppsr.resume_session(context, StubPage("about:blank"), state_path, "req") is True
+    assert os.path.exists(state_path)
+    assert not context.cookies_cleared
+
+
+@pytest.mark.asyncio
+async def test_resume_session_discards_on_redirect_to_login(session_dir):
+    state_path = ppsr.session_state_path("user", "pass")
+    _write_state(session_dir / os.path.basename(state_path))
+    context = StubContext()
+
+    assert await ppsr.resume_session(context, StubPage("about:blank", vin_present=False), state_path, "req") is False
+    assert not os.path.exists(state_path)
+    assert context.cookies_cleared
+
+
+@pytest.mark.asyncio
+async def test_resume_session_discards_bad_json(session_dir):
+    state_path = ppsr.session_state_path("user", "pass")
+    (session_dir / os.path.basename(state_path)).write_text("not json", encoding="utf-8")
+
+    assert await ppsr.resume_session(StubContext(), StubPage("about:blank"), state_path, "req") is False
+    assert not os.path.exists(state_path)
+
+
+def test_old_sessions_are_discarded_and_pruned(session_dir):
+    stale = session_dir / "stale.state.json"
+    fresh = session_dir / "fresh.state.json"
+    secret = session_dir / ".secret"
+    for path in (stale, fresh, secret):
+        _write_state(path)
+    old = time.time() - ppsr.SESSION_MAX_AGE_S - 1
+    os.utime(stale, (old, old))
+    os.utime(secret, (old, old))
+
+    assert ppsr.fresh_session_state(str(stale), "req") is None
+    assert not stale.exists()
+    assert ppsr.fresh_session_state(str(fresh), "req") == str(fresh)
+
+    _write_state(stale)
+    os.utime(stale, (old, old))
+    ppsr.prune_sessions()
+    assert sorted(os.listdir(session_dir)) == [".secret", "fresh.state.json"]
+
+
+def test_generated_session_secret_is_persisted(session_dir, monkeypatch):
+    monkeypatch.delenv("PPSR_SESSION_SECRET", raising=False)
+    first = ppsr._load_session_secret()
+    assert len(first) == 32
+    assert ppsr._load_session_secret() == first
+    if os.name == "posix":
+        assert stat.S_IMODE(os.stat(session_dir / ".secret").st_mode) == 0o600
+
+    monkeypatch.setenv("PPSR_SESSION_SECRET", "from-env")
+    assert ppsr._load_session_secret() == b"from-env"